@@ -5,17 +5,70 @@ Apify actor for web scraping that extracts text content and media files from URL
 Designed for integration with Make.com and n8n automation platforms.
 """
 
+import asyncio
+import codecs
 import json
 import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urljoin, urlparse
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional
 from datetime import datetime
 
 import requests
-from bs4 import BeautifulSoup, Tag
+from requests.adapters import HTTPAdapter
+from lxml import etree as lxml_etree
+from lxml import html as lxml_html
+from lxml.html import HtmlElement
 import trafilatura
 from apify import Actor
 
+# Maximum number of URLs fetched and processed at the same time. Each worker
+# can hold a 10 MB body plus its lxml tree and trafilatura's copy of it, so
+# this is kept low enough to fit the actor's 1024 MB memory limit
+_MAX_CONCURRENCY = 8
+
+# Post body on LinkedIn feed updates and public post pages
+_LINKEDIN_POST_XPATH = lxml_etree.XPath(
+    '//*[@data-test-id="main-feed-activity-card__commentary"'
+    ' or contains(concat(" ", normalize-space(@class), " "), " feed-shared-update-v2__description ")]'
+)
+
+# Number of results sent to the dataset per push_data call
+_PUSH_BATCH_SIZE = 100
+
+# http(s) scheme followed by a non-empty host
+_URL_RE = re.compile(r'^https?://[^\s/?#]+', re.IGNORECASE)
+
+# Response bodies are streamed in chunks and capped to bound memory use
+_CHUNK_SIZE = 64 * 1024
+_MAX_BYTES = 10 * 1024 * 1024
+_HTML_CONTENT_TYPES = ('text/html', 'application/xhtml')
+
+# In-document encoding declarations that libxml2 detects on its own
+_BOMS = (codecs.BOM_UTF8, codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+charset', re.IGNORECASE)
+
+# Document links (PDF, DOC, etc.), optionally followed by a query string or fragment
+_DOC_EXT_RE = re.compile(r'\.(pdf|docx?|xlsx?|pptx?|txt)(?:$|[?#])', re.IGNORECASE)
+
+
+def _build_session() -> requests.Session:
+    """
+    Create an HTTP session that reuses pooled connections across requests.
+    """
+    session = requests.Session()
+    session.headers.update({
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+    })
+    adapter = HTTPAdapter(pool_connections=_MAX_CONCURRENCY, pool_maxsize=_MAX_CONCURRENCY)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+_SESSION = _build_session()
+
 
 async def main():
     """
@@ -25,68 +78,113 @@ async def main():
         # Get actor input
         actor_input = await Actor.get_input() or {}
         
-        # Extract URL from input
-        url = actor_input.get('url')
-        if not url:
+        # Timestamp shared by every result produced in this run
+        scraped_at = datetime.now().isoformat()
+        
+        # Extract URLs from input, falling back to the single-URL field
+        urls = actor_input.get('urls') or []
+        if not urls and actor_input.get('url'):
+            urls = [actor_input['url']]
+        if not urls:
             error_result = {
                 'url': None,
                 'success': False,
                 'error': 'No URL provided in input',
                 'error_type': 'missing_input',
-                'scraped_at': datetime.now().isoformat()
+                'scraped_at': scraped_at
             }
             await Actor.push_data(error_result)
             Actor.log.error('No URL provided in input')
             return
         
-        Actor.log.info(f'Starting to scrape URL: {url}')
+        Actor.log.info(f'Starting to scrape {len(urls)} URL(s)')
         
-        try:
-            # Validate URL
-            if not is_valid_url(url):
-                error_result = {
-                    'url': url,
-                    'success': False,
-                    'error': f'Invalid URL provided: {url}',
-                    'error_type': 'validation_error',
-                    'scraped_at': datetime.now().isoformat()
-                }
-                await Actor.push_data(error_result)
-                Actor.log.error(f'Invalid URL provided: {url}')
-                return
-            
-            # Extract content from URL
-            result = scrape_url_content(url)
-            
-            # Push result to dataset
-            await Actor.push_data(result)
-            
-            Actor.log.info('Successfully scraped and processed URL')
-            
-        except Exception as e:
+        # Fetch and process all URLs concurrently on a dedicated worker pool,
+        # pushing results in batches
+        with ThreadPoolExecutor(max_workers=_MAX_CONCURRENCY) as executor:
+            batch = []
+            for task in asyncio.as_completed([process_url(url, executor, scraped_at) for url in urls]):
+                batch.append(await task)
+                if len(batch) >= _PUSH_BATCH_SIZE:
+                    await Actor.push_data(batch)
+                    batch = []
+            if batch:
+                await Actor.push_data(batch)
+
+
+async def process_url(url: str, executor: ThreadPoolExecutor, scraped_at: str) -> Dict[str, Any]:
+    """
+    Validate and scrape a single URL, returning the result to push to the dataset.
+    """
+    try:
+        # Drop surrounding whitespace often pasted in from automation tools
+        if isinstance(url, str):
+            url = url.strip()
+        
+        # Validate URL
+        if not is_valid_url(url):
             error_result = {
-                'url': url if 'url' in locals() else 'unknown',
+                'url': url,
                 'success': False,
-                'error': f'Error processing URL: {str(e)}',
-                'error_type': 'processing_error',
-                'scraped_at': datetime.now().isoformat()
+                'error': f'Invalid URL provided: {url}',
+                'error_type': 'validation_error',
+                'scraped_at': scraped_at
             }
-            await Actor.push_data(error_result)
-            Actor.log.error(f'Error processing URL: {str(e)}')
+            Actor.log.error(f'Invalid URL provided: {url}')
+            return error_result
+        
+        # Extract content from URL in a worker thread so fetches overlap
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(executor, scrape_url_content, url, scraped_at)
+        
+        Actor.log.info(f'Successfully scraped and processed URL: {url}')
+        
+        return result
+        
+    except Exception as e:
+        error_result = {
+            'url': url,
+            'success': False,
+            'error': f'Error processing URL: {str(e)}',
+            'error_type': 'processing_error',
+            'scraped_at': scraped_at
+        }
+        Actor.log.error(f'Error processing URL: {str(e)}')
+        return error_result
 
 
 def is_valid_url(url: str) -> bool:
     """
     Validate if the provided string is a valid URL.
     """
+    return isinstance(url, str) and _URL_RE.match(url) is not None
+
+
+def detect_encoding(content_type: str, header_encoding: Optional[str], html_bytes: bytes) -> Optional[str]:
+    """
+    Pick the charset to parse the page with, or None to let libxml2 detect it.
+    """
+    # Trust an explicit, known charset from the Content-Type header
+    if header_encoding and 'charset' in content_type.lower():
+        try:
+            codecs.lookup(header_encoding)
+            return header_encoding
+        except LookupError:
+            pass
+    
+    # libxml2 picks up a BOM or <meta charset> declaration by itself
+    if html_bytes.startswith(_BOMS) or _META_CHARSET_RE.search(html_bytes, 0, 1024):
+        return None
+    
+    # Undeclared: use UTF-8 when the body is valid UTF-8, else libxml2's default
     try:
-        result = urlparse(url)
-        return all([result.scheme, result.netloc])
-    except Exception:
-        return False
+        html_bytes.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return None
 
 
-def scrape_url_content(url: str) -> Dict[str, Any]:
+def scrape_url_content(url: str, scraped_at: str) -> Dict[str, Any]:
     """
     Scrape content from the given URL and return structured data.
     """
@@ -94,51 +192,62 @@ def scrape_url_content(url: str) -> Dict[str, Any]:
     
     # Download page content
     try:
-        response = requests.get(url, timeout=30, headers={
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
-        response.raise_for_status()
-        html_content = response.text
+        with _SESSION.get(url, timeout=30, stream=True) as response:
+            response.raise_for_status()
+            
+            # Skip non-HTML responses before downloading the body
+            content_type = response.headers.get('Content-Type', '')
+            if content_type and not content_type.lower().startswith(_HTML_CONTENT_TYPES):
+                return {
+                    'url': url,
+                    'success': False,
+                    'error': f'Unsupported content type: {content_type}',
+                    'error_type': 'wrong_content_type',
+                    'scraped_at': scraped_at
+                }
+            
+            # Read the body in chunks, aborting once it exceeds the size limit
+            chunks = []
+            size = 0
+            for chunk in response.iter_content(_CHUNK_SIZE):
+                size += len(chunk)
+                if size > _MAX_BYTES:
+                    return {
+                        'url': url,
+                        'success': False,
+                        'error': f'Page exceeds the maximum size of {_MAX_BYTES} bytes',
+                        'error_type': 'too_large',
+                        'scraped_at': scraped_at
+                    }
+                chunks.append(chunk)
+            html_bytes = b''.join(chunks)
+            
+            encoding = detect_encoding(content_type, response.encoding, html_bytes)
     except Exception as e:
         return {
             'url': url,
             'success': False,
             'error': f'Failed to fetch URL: {str(e)}',
             'error_type': 'network_error',
-            'scraped_at': datetime.now().isoformat()
+            'scraped_at': scraped_at
         }
     
     try:
-        # Extract text content using trafilatura
-        Actor.log.info('Extracting text content...')
-        text_content = trafilatura.extract(html_content) or ""
-        
-        # Parse HTML for media files
-        Actor.log.info('Extracting media files...')
-        soup = BeautifulSoup(html_content, 'html.parser')
-        media_files = extract_media_files(soup, url)
-        
-        # Get page metadata
-        metadata = extract_page_metadata(soup, url)
-        
-        # Structure the output
-        result = {
-            'url': url,
-            'title': metadata.get('title', ''),
-            'description': metadata.get('description', ''),
-            'text_content': text_content,
-            'word_count': len(text_content.split()) if text_content else 0,
-            'media_files': media_files,
-            'media_count': {
-                'images': len([f for f in media_files if f['type'] == 'image']),
-                'videos': len([f for f in media_files if f['type'] == 'video']),
-                'documents': len([f for f in media_files if f['type'] == 'document'])
-            },
-            'scraped_at': datetime.now().isoformat(),
-            'success': True
-        }
-        
-        return result
+        # Parse HTML once and share the tree between all extractors
+        try:
+            parser = lxml_html.HTMLParser(encoding=encoding) if encoding else None
+        except LookupError:
+            # Charset known to Python but not to libxml2; let libxml2 detect it
+            parser = None
+        try:
+            tree = lxml_html.fromstring(html_bytes, parser=parser)
+        except lxml_etree.ParserError:
+            # Empty, whitespace-only or comment-only pages have nothing to extract
+            return _build_result(url, '', '', '', [], scraped_at)
+
+        # Dispatch to a site-specific extractor when one exists for this host
+        extractor = _select_extractor(url)
+        return extractor(tree, url, scraped_at)
         
     except Exception as e:
         return {
@@ -146,102 +255,233 @@ def scrape_url_content(url: str) -> Dict[str, Any]:
             'success': False,
             'error': f'Error extracting content: {str(e)}',
             'error_type': 'extraction_error',
-            'scraped_at': datetime.now().isoformat()
+            'scraped_at': scraped_at
         }
 
 
-def extract_media_files(soup: BeautifulSoup, base_url: str) -> List[Dict[str, Any]]:
+def _select_extractor(url: str) -> Callable[[HtmlElement, str, str], Dict[str, Any]]:
+    """
+    Return the content extractor registered for the URL's host, or the generic one.
+    """
+    host = (urlparse(url).hostname or '').lower()
+    for domain, extractor in _EXTRACTORS.items():
+        if host == domain or host.endswith('.' + domain):
+            return extractor
+    return extract_generic_content
+
+
+def _build_result(url: str, title: str, description: str, text_content: str,
+                  media_files: List[Dict[str, Any]], scraped_at: str) -> Dict[str, Any]:
+    """
+    Structure the extracted content into the actor's output format.
+    """
+    # Tally media files by type in a single pass
+    type_counts = Counter(f['type'] for f in media_files)
+    
+    return {
+        'url': url,
+        'title': title,
+        'description': description,
+        'text_content': text_content,
+        'word_count': len(text_content.split()) if text_content else 0,
+        'media_files': media_files,
+        'media_count': {
+            'images': type_counts['image'],
+            'videos': type_counts['video'],
+            'documents': type_counts['document']
+        },
+        'scraped_at': scraped_at,
+        'success': True
+    }
+
+
+def extract_generic_content(tree: HtmlElement, url: str, scraped_at: str) -> Dict[str, Any]:
+    """
+    Extract text, media files and metadata from an arbitrary web page.
+    """
+    # Extract text content using trafilatura (works on its own copy of the tree)
+    Actor.log.info('Extracting text content...')
+    text_content = trafilatura.extract(tree) or ""
+    
+    # Extract media files
+    Actor.log.info('Extracting media files...')
+    media_files = extract_media_files(tree, url)
+    
+    # Get page metadata
+    metadata = extract_page_metadata(tree, url)
+    
+    return _build_result(url, metadata.get('title', ''), metadata.get('description', ''),
+                         text_content, media_files, scraped_at)
+
+
+def _element_text(element: HtmlElement) -> str:
+    """
+    Return an element's text with <br> treated as a line break, one stripped line per row.
+    """
+    parts = []
+    for event, node in lxml_etree.iterwalk(element, events=('start', 'end')):
+        if event == 'start':
+            if node.tag == 'br':
+                parts.append('\n')
+            elif isinstance(node.tag, str) and node.text:
+                parts.append(node.text)
+        elif node is not element and node.tail:
+            parts.append(node.tail)
+    lines = (line.strip() for line in ''.join(parts).split('\n'))
+    return '\n'.join(line for line in lines if line)
+
+
+def extract_linkedin_content(tree: HtmlElement, url: str, scraped_at: str) -> Dict[str, Any]:
+    """
+    Extract content from a LinkedIn page using its known post markup and Open Graph tags.
+    """
+    # LinkedIn always emits Open Graph tags; only fall back to the generic lookup if missing
+    metas = _collect_meta(tree)
+    title = (metas.get('og:title') or '').strip()
+    description = (metas.get('og:description') or '').strip()
+    if not (title and description):
+        metadata = extract_page_metadata(tree, url, metas)
+        title = title or metadata.get('title', '')
+        description = description or metadata.get('description', '')
+    
+    # Read the post body from its known container, falling back to trafilatura
+    Actor.log.info('Extracting LinkedIn post content...')
+    post_nodes = _LINKEDIN_POST_XPATH(tree)
+    if post_nodes:
+        text_content = _element_text(post_nodes[0])
+    else:
+        text_content = trafilatura.extract(tree) or ""
+    
+    # LinkedIn posts do not link documents directly, so skip the link scan
+    Actor.log.info('Extracting media files...')
+    media_files = extract_media_files(tree, url, include_documents=False)
+    
+    return _build_result(url, title, description, text_content, media_files, scraped_at)
+
+
+# Site-specific extractors, keyed by domain (subdomains included)
+_EXTRACTORS: Dict[str, Callable[[HtmlElement, str, str], Dict[str, Any]]] = {
+    'linkedin.com': extract_linkedin_content,
+}
+
+
+def extract_media_files(tree: HtmlElement, base_url: str, include_documents: bool = True) -> List[Dict[str, Any]]:
     """
     Extract media files (images, videos, documents) from the HTML content.
     """
     media_files = []
+    append = media_files.append
+    seen = set()
+    seen_add = seen.add
     
-    # Extract images
-    for img in soup.find_all('img', src=True):
-        if isinstance(img, Tag) and img.get('src'):
-            img_url = urljoin(base_url, img.get('src'))
-            media_files.append({
+    # Walk the tree once, in document order, dispatching on tag name
+    tags = ('img', 'video', 'source', 'a') if include_documents else ('img', 'video', 'source')
+    for el in tree.iter(*tags):
+        tag = el.tag
+        
+        # Resolve the media type and URL, skipping links that are not documents
+        if tag == 'a':
+            raw_url = el.get('href')
+            m = _DOC_EXT_RE.search(raw_url) if raw_url else None
+            if not m:
+                continue
+            media_type = 'document'
+        else:
+            raw_url = el.get('src')
+            if not raw_url:
+                continue
+            media_type = 'image' if tag == 'img' else 'video'
+        
+        # Skip media already listed in the same role (sprites, logos, tracking pixels)
+        media_url = urljoin(base_url, raw_url)
+        key = (media_type, media_url)
+        if key in seen:
+            continue
+        seen_add(key)
+        
+        # Extract images
+        if tag == 'img':
+            append({
                 'type': 'image',
-                'url': img_url,
-                'alt': img.get('alt', ''),
-                'title': img.get('title', '')
+                'url': media_url,
+                'alt': el.get('alt', ''),
+                'title': el.get('title', '')
             })
-    
-    # Extract videos
-    for video in soup.find_all('video', src=True):
-        if isinstance(video, Tag) and video.get('src'):
-            video_url = urljoin(base_url, video.get('src'))
-            media_files.append({
+        
+        # Extract videos
+        elif tag == 'video':
+            append({
                 'type': 'video',
-                'url': video_url,
-                'title': video.get('title', '')
+                'url': media_url,
+                'title': el.get('title', '')
             })
-    
-    # Extract video sources
-    for source in soup.find_all('source', src=True):
-        if isinstance(source, Tag) and source.get('src'):
-            source_url = urljoin(base_url, source.get('src'))
-            media_files.append({
+        
+        # Extract video sources
+        elif tag == 'source':
+            append({
                 'type': 'video',
-                'url': source_url,
-                'mime_type': source.get('type', '')
+                'url': media_url,
+                'mime_type': el.get('type', '')
+            })
+        
+        # Extract document links (PDF, DOC, etc.)
+        else:
+            append({
+                'type': 'document',
+                'url': media_url,
+                'text': el.text_content().strip(),
+                'extension': m.group(1).lower()
             })
-    
-    # Extract document links (PDF, DOC, etc.)
-    document_extensions = ['.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx', '.txt']
-    for link in soup.find_all('a', href=True):
-        if isinstance(link, Tag) and link.get('href'):
-            href_val = link.get('href')
-            if isinstance(href_val, str):
-                href = href_val.lower()
-                if any(href.endswith(ext) for ext in document_extensions):
-                    doc_url = urljoin(base_url, href_val)
-                    media_files.append({
-                        'type': 'document',
-                        'url': doc_url,
-                        'text': link.get_text().strip(),
-                        'extension': href.split('.')[-1] if '.' in href else 'unknown'
-                    })
     
     return media_files
 
 
-def extract_page_metadata(soup: BeautifulSoup, url: str) -> Dict[str, str]:
+def _collect_meta(tree: HtmlElement) -> Dict[str, Optional[str]]:
+    """
+    Map each meta tag's name/property to its content, keeping the first occurrence.
+    """
+    metas = {}
+    for meta in tree.iter('meta'):
+        content = meta.get('content')
+        # Tags often carry both attributes (name="twitter:title" property="og:title")
+        for key in (meta.get('name'), meta.get('property')):
+            if key and key not in metas:
+                metas[key] = content
+    return metas
+
+
+def extract_page_metadata(tree: HtmlElement, url: str,
+                          metas: Optional[Dict[str, Optional[str]]] = None) -> Dict[str, str]:
     """
-    Extract metadata from the HTML page.
+    Extract metadata from the HTML page, reusing already collected meta tags if given.
     """
     metadata = {}
+    if metas is None:
+        metas = _collect_meta(tree)
     
     # Extract title
-    title_tag = soup.find('title')
-    if title_tag and isinstance(title_tag, Tag):
-        metadata['title'] = title_tag.get_text().strip()
+    title_tag = tree.find('.//title')
+    if title_tag is not None:
+        metadata['title'] = title_tag.text_content().strip()
     
     # Extract meta description
-    desc_tag = soup.find('meta', attrs={'name': 'description'})
-    if desc_tag and isinstance(desc_tag, Tag):
-        content = desc_tag.get('content')
-        if isinstance(content, str):
-            metadata['description'] = content.strip()
+    description = metas.get('description')
+    if description is not None:
+        metadata['description'] = description.strip()
     
     # Extract Open Graph title and description as fallback
     if not metadata.get('title'):
-        og_title = soup.find('meta', attrs={'property': 'og:title'})
-        if og_title and isinstance(og_title, Tag):
-            content = og_title.get('content')
-            if isinstance(content, str):
-                metadata['title'] = content.strip()
+        og_title = metas.get('og:title')
+        if og_title is not None:
+            metadata['title'] = og_title.strip()
     
     if not metadata.get('description'):
-        og_desc = soup.find('meta', attrs={'property': 'og:description'})
-        if og_desc and isinstance(og_desc, Tag):
-            content = og_desc.get('content')
-            if isinstance(content, str):
-                metadata['description'] = content.strip()
+        og_desc = metas.get('og:description')
+        if og_desc is not None:
+            metadata['description'] = og_desc.strip()
     
     return metadata
 
 
 if __name__ == '__main__':
-    import asyncio
     asyncio.run(main())
\ No newline at end of file